@@ -13,12 +13,18 @@ Usage:
 Or use the generate() function programmatically.
 """
 
-import argparse
+import functools
+import os
+import time
 from pathlib import Path
+from typing import Iterable
 
 from prompt_template import build_prompt, SYSTEM_PROMPT
-from parser import parse_ai_output, validate_boxes, Box
-from renderer import CheatSheetRenderer
+from parser import parse_ai_output, parse_ai_output_stream, validate_boxes, Box
+
+# Boxes are measured in worker processes only for sheets at least this big;
+# below it, starting the pool costs more than measuring in-process
+PARALLEL_MEASURE_MIN_BOXES = 200
 
 
 def generate_from_ai_output(ai_output: str, output_path: str = "cheatsheet.pdf") -> str:
@@ -32,17 +38,67 @@ def generate_from_ai_output(ai_output: str, output_path: str = "cheatsheet.pdf")
     Returns:
         Path to generated PDF
     """
-    boxes = parse_ai_output(ai_output)
-    
+    return _render_boxes(parse_ai_output(ai_output), output_path)
+
+
+def _render_boxes(boxes: list[Box], output_path: str) -> str:
+    """Render parsed boxes to a PDF and return its path."""
     if not boxes:
         raise ValueError("No boxes found in AI output. Check the format.")
     
+    # ReportLab is only imported once there is something to render
+    from renderer import CheatSheetRenderer, measure_box
+    
     print(f"Parsed {len(boxes)} boxes:")
     for box in boxes:
         print(f"  [{box.id}] {box.title[:50]}...")
     
+    # Measuring (text wrapping) is independent per box; placement and drawing
+    # stay sequential in this process
+    sizes = None
+    if len(boxes) >= PARALLEL_MEASURE_MIN_BOXES:
+        from concurrent.futures import ProcessPoolExecutor
+        
+        with ProcessPoolExecutor() as executor:
+            sizes = list(executor.map(measure_box, boxes, chunksize=8))
+    
     renderer = CheatSheetRenderer(output_path)
-    renderer.render(boxes)
+    renderer.render(boxes, sizes=sizes)
+    
+    return output_path
+
+
+def generate_from_ai_output_stream(chunks: Iterable[str], output_path: str = "cheatsheet.pdf") -> str:
+    """
+    Generate PDF from AI output that is still arriving (e.g. a streamed API response).
+    
+    Each box is measured as soon as its [/BOX] arrives, so text wrapping overlaps
+    with generation of the remaining boxes; only placement and drawing are left
+    for the end. The PDF is identical to generate_from_ai_output() on the full text.
+    
+    Args:
+        chunks: Pieces of raw AI output with [BOX] delimiters, in order
+        output_path: Where to save the PDF
+        
+    Returns:
+        Path to generated PDF
+    """
+    from renderer import CheatSheetRenderer
+    
+    renderer = CheatSheetRenderer(output_path)
+    renderer.begin()
+    
+    box_count = 0
+    for box in parse_ai_output_stream(chunks):
+        print(f"  [{box.id}] {box.title[:50]}...")
+        renderer.add_box(box)
+        box_count += 1
+    
+    if not box_count:
+        raise ValueError("No boxes found in AI output. Check the format.")
+    
+    print(f"Parsed {box_count} boxes")
+    renderer.finish()
     
     return output_path
 
@@ -52,7 +108,9 @@ def generate_with_api(
     topics: list[str],
     api_key: str,
     output_path: str = "cheatsheet.pdf",
-    model: str = "claude-sonnet-4-20250514"
+    model: str = "claude-sonnet-4-20250514",
+    batch: bool = False,
+    cache_lecture: bool = False
 ) -> str:
     """
     Full pipeline: lecture content → AI → PDF
@@ -63,6 +121,10 @@ def generate_with_api(
         api_key: Anthropic API key
         output_path: Where to save PDF
         model: Which Claude model to use
+        batch: Submit through the Message Batches API (half price, but results
+            can take minutes to hours) instead of a live request
+        cache_lecture: Also cache the lecture part of the prompt, for repeat
+            runs on the same lecture (ignored with batch)
         
     Returns:
         Path to generated PDF
@@ -72,37 +134,165 @@ def generate_with_api(
     except ImportError:
         raise ImportError("Install anthropic: pip install anthropic")
     
-    # Build prompts
-    system_prompt, user_prompt = build_prompt(topics, lecture_content)
-    
     # Call Claude
     client = anthropic.Anthropic(api_key=api_key)
+    params = _request_params(lecture_content, topics, model, cache_lecture and not batch)
+    
+    if batch:
+        print("Submitting Claude API batch...")
+        ai_output = _run_batch(client, params)
+        print(f"Received {len(ai_output)} characters from AI")
+        return generate_from_ai_output(ai_output, output_path)
     
     print("Calling Claude API...")
-    response = client.messages.create(
-        model=model,
-        max_tokens=8000,
-        system=system_prompt,
-        messages=[{"role": "user", "content": user_prompt}]
-    )
+    with client.messages.stream(**params) as stream:
+        # Work on each box while the rest of the response is still being generated
+        generate_from_ai_output_stream(stream.text_stream, output_path)
+        print(f"Received {len(stream.get_final_text())} characters from AI")
     
+    return output_path
+
+
+def _request_params(lecture_content: str, topics: list[str], model: str,
+                    cache_lecture: bool = False) -> dict:
+    """
+    Messages API parameters for one cheat sheet.
+    
+    The system prompt is always marked cacheable (it is the same on every call;
+    blocks under the model's minimum cacheable length are simply not cached).
+    cache_lecture also caches the user prompt, which only pays off when the
+    same lecture is sent again soon: a cache write costs more than plain input.
+    """
+    system_prompt, user_prompt = build_prompt(topics, lecture_content)
+    
+    user_block = {"type": "text", "text": user_prompt}
+    if cache_lecture:
+        user_block["cache_control"] = {"type": "ephemeral"}
+    
+    return {
+        "model": model,
+        "max_tokens": 8000,
+        "system": [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}],
+        "messages": [{"role": "user", "content": [user_block]}]
+    }
+
+
+async def generate_with_api_async(
+    client,
+    lecture_content: str,
+    topics: list[str],
+    output_path: str = "cheatsheet.pdf",
+    model: str = "claude-sonnet-4-20250514"
+) -> str:
+    """
+    Async version of generate_with_api() for an anthropic.AsyncAnthropic client.
+    
+    Rendering runs in a worker thread so other requests keep making progress.
+    
+    Returns:
+        Path to generated PDF
+    """
+    import asyncio
+    
+    response = await client.messages.create(**_request_params(lecture_content, topics, model))
     ai_output = response.content[0].text
-    print(f"Received {len(ai_output)} characters from AI")
+    print(f"Received {len(ai_output)} characters from AI for {output_path}")
     
-    # Parse and render
-    return generate_from_ai_output(ai_output, output_path)
+    return await asyncio.to_thread(generate_from_ai_output, ai_output, output_path)
+
+
+def generate_many(
+    lectures: list[tuple[str, list[str], str]],
+    api_key: str,
+    model: str = "claude-sonnet-4-20250514",
+    max_concurrency: int | None = None
+) -> list[str]:
+    """
+    Generate several cheat sheets with concurrent API calls.
+    
+    Args:
+        lectures: (lecture_content, topics, output_path) for each cheat sheet
+        api_key: Anthropic API key
+        model: Which Claude model to use
+        max_concurrency: Maximum requests in flight
+            (default: ANTHROPIC_CONCURRENCY environment variable, or 5)
+        
+    Returns:
+        Paths to the generated PDFs, in the same order as lectures
+    """
+    import asyncio
+    
+    try:
+        import anthropic
+    except ImportError:
+        raise ImportError("Install anthropic: pip install anthropic")
+    
+    if max_concurrency is None:
+        max_concurrency = int(os.environ.get("ANTHROPIC_CONCURRENCY", "5"))
+    
+    async def run_all() -> list[str]:
+        client = anthropic.AsyncAnthropic(api_key=api_key)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def one(lecture_content: str, topics: list[str], output_path: str) -> str:
+            async with semaphore:
+                return await generate_with_api_async(client, lecture_content, topics, output_path, model)
+        
+        return await asyncio.gather(*(one(*lecture) for lecture in lectures))
+    
+    print(f"Calling Claude API for {len(lectures)} cheat sheets...")
+    return asyncio.run(run_all())
+
+
+def _run_batch(client, params: dict, poll_interval: float = 30) -> str:
+    """Send one request through the Message Batches API and wait for its text."""
+    message_batch = client.messages.batches.create(
+        requests=[{"custom_id": "cheatsheet", "params": params}]
+    )
+    
+    while message_batch.processing_status != "ended":
+        time.sleep(poll_interval)
+        message_batch = client.messages.batches.retrieve(message_batch.id)
+    
+    for entry in client.messages.batches.results(message_batch.id):
+        if entry.result.type != "succeeded":
+            raise RuntimeError(f"Batch request {entry.custom_id} {entry.result.type}")
+        return entry.result.message.content[0].text
+    
+    raise RuntimeError("Batch finished without results")
 
 
 def main():
+    import argparse
+    
     parser = argparse.ArgumentParser(description="Generate cheat sheet PDF from AI output")
     parser.add_argument("--ai-output", type=str, help="File containing AI output with [BOX] format")
+    parser.add_argument("--input", type=str, help="Lecture text file to send to Claude (needs ANTHROPIC_API_KEY)")
+    parser.add_argument("--topics", type=str, help="Topics file for --input, one topic per line")
     parser.add_argument("--output", "-o", type=str, default="cheatsheet.pdf", help="Output PDF path")
+    parser.add_argument("--batch", action="store_true", help="Use the Message Batches API (half price, slower)")
+    parser.add_argument("--cache-lecture", action="store_true",
+                        help="Cache the lecture prompt too, when re-running the same --input soon")
     
     args = parser.parse_args()
     
     if args.ai_output:
         ai_text = Path(args.ai_output).read_text(encoding="utf-8")
         generate_from_ai_output(ai_text, args.output)
+    elif args.input:
+        if not args.topics:
+            parser.error("--input requires --topics")
+        if args.cache_lecture and args.batch:
+            parser.error("--cache-lecture can't be combined with --batch")
+        api_key = os.environ.get("ANTHROPIC_API_KEY")
+        if not api_key:
+            parser.error("Set ANTHROPIC_API_KEY to generate from lecture content")
+        
+        lecture_content = Path(args.input).read_text(encoding="utf-8")
+        topics_text = Path(args.topics).read_text(encoding="utf-8")
+        topics = [line.strip() for line in topics_text.splitlines() if line.strip()]
+        generate_with_api(lecture_content, topics, api_key, args.output, batch=args.batch,
+                          cache_lecture=args.cache_lecture)
     else:
         # Demo mode with sample data
         print("No input provided. Running demo...")
@@ -111,7 +301,19 @@ def main():
 
 def demo():
     """Run demo with sample AI output."""
-    sample_ai_output = """
+    _render_boxes(list(_demo_boxes()), "demo_cheatsheet.pdf")
+    print("\n✓ Demo complete! Check demo_cheatsheet.pdf")
+
+
+@functools.lru_cache(maxsize=1)
+def _demo_boxes() -> tuple[Box, ...]:
+    """The sample output parsed once per process (repeated demo runs reuse it)."""
+    return tuple(parse_ai_output(_sample_ai_output()))
+
+
+def _sample_ai_output() -> str:
+    """Sample AI output used by the demo."""
+    return """
 [BOX:A1]
 [TITLE:Introduction to Project Management]
 **Project Management** = Applying knowledge, skills, tools, and techniques to meet project requirements and objectives.
@@ -360,9 +562,6 @@ Solutions:
 • Regular capacity planning
 [/BOX]
 """
-    
-    generate_from_ai_output(sample_ai_output, "demo_cheatsheet.pdf")
-    print("\n✓ Demo complete! Check demo_cheatsheet.pdf")
 
 
 if __name__ == "__main__":
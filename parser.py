@@ -3,11 +3,21 @@ Parser for AI-generated cheat sheet content.
 Extracts boxes from the delimited format into structured data.
 """
 
+import functools
+import logging
 import re
+import textwrap
 from dataclasses import dataclass
+from typing import Iterable, Iterator
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+
+# Pattern to match each box block - permissive to capture various formats
+BOX_PATTERN = re.compile(r'\[BOX:([A-Za-z0-9\-_.]+)\]\s*\[TITLE:([^\]]+)\]\s*(.*?)\[/BOX\]', re.DOTALL)
+
+
+@dataclass(slots=True, frozen=True)
 class Box:
     id: str
     title: str
@@ -16,8 +26,8 @@ class Box:
     @property
     def category(self) -> str:
         """Extract category letter from ID (e.g., 'A' from 'A5' or 'A0')"""
-        match = re.match(r'^([A-Z])', self.id)
-        return match.group(1) if match else 'A'
+        first = self.id[:1]
+        return first if 'A' <= first <= 'Z' else 'A'
 
 
 def parse_ai_output(raw_output: str) -> list[Box]:
@@ -37,30 +47,69 @@ def parse_ai_output(raw_output: str) -> list[Box]:
     Returns:
         List of Box objects
     """
-    boxes = []
+    # Boxes are immutable, so cached results can be shared; only the list is new
+    return list(_parse_cached(raw_output))
+
+
+@functools.lru_cache(maxsize=16)
+def _parse_cached(raw_output: str) -> tuple[Box, ...]:
+    return tuple(_parse_boxes(raw_output))
+
+
+def _parse_boxes(raw_output: str) -> list[Box]:
+    # The ID pattern can't match whitespace, so only title and content need stripping
+    boxes = [
+        Box(id=match.group(1), title=match.group(2).strip(), content=match.group(3).strip())
+        for match in BOX_PATTERN.finditer(raw_output)
+    ]
     
-    # Pattern to match each box block - permissive to capture various formats
-    pattern = r'\[BOX:([A-Za-z0-9\-_.]+)\]\s*\[TITLE:([^\]]+)\]\s*(.*?)\[/BOX\]'
+    # Validate box ID format and warn if non-conforming
+    if logger.isEnabledFor(logging.WARNING):
+        for box in boxes:
+            if not _is_strict_id(box.id):
+                _warn_bad_id(box.id, box.title)
     
-    matches = re.findall(pattern, raw_output, re.DOTALL)
+    return boxes
+
+
+def _is_strict_id(box_id: str) -> bool:
+    """Strict ID format: one capital letter followed by digits (A1, B2, C10).
+    BOX_PATTERN only lets ASCII through, so isdigit() means 0-9 here."""
+    return len(box_id) >= 2 and 'A' <= box_id[0] <= 'Z' and box_id[1:].isdigit()
+
+
+def _warn_bad_id(box_id: str, title: str):
+    logger.warning(
+        "Box ID '%s' does not match the strict format [A-Z][0-9]+ (e.g., A1, B2, C10)\n"
+        "         Title: %s",
+        box_id, textwrap.shorten(title, 50, placeholder='...')
+    )
+
+
+def parse_ai_output_stream(chunks: Iterable[str]) -> Iterator[Box]:
+    """
+    Parse AI output that arrives in pieces (e.g. a streamed API response).
     
-    # Strict format pattern for validation
-    strict_pattern = re.compile(r'^[A-Z]\d+$')
+    Each box is yielded as soon as its [/BOX] delimiter has arrived, so callers
+    can work on early boxes while later ones are still being generated. The
+    buffer is only ever cut right after a [/BOX], which gives exactly the same
+    boxes as parse_ai_output() on the full text.
     
-    for match in matches:
-        box_id = match[0].strip()
-        title = match[1].strip()
-        content = match[2].strip()
-        
-        # Validate box ID format and warn if non-conforming
-        if not strict_pattern.match(box_id):
-            print(f"WARNING: Box ID '{box_id}' does not match the strict format [A-Z][0-9]+ (e.g., A1, B2, C10)")
-            title_preview = title[:50] + ('...' if len(title) > 50 else '')
-            print(f"         Title: {title_preview}")
+    Args:
+        chunks: Pieces of raw AI output, in order
         
-        boxes.append(Box(id=box_id, title=title, content=content))
-    
-    return boxes
+    Yields:
+        Box objects
+    """
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        end = buffer.rfind('[/BOX]')
+        if end == -1:
+            continue
+        end += len('[/BOX]')
+        yield from _parse_boxes(buffer[:end])
+        buffer = buffer[end:]
 
 
 def validate_boxes(boxes: list[Box], expected_ids: list[str]) -> dict:
@@ -74,14 +123,15 @@ def validate_boxes(boxes: list[Box], expected_ids: list[str]) -> dict:
     Returns:
         Dict with 'missing', 'extra', and 'valid' keys
     """
-    found_ids = {box.id for box in boxes}
-    expected_set = set(expected_ids)
+    found_ids = frozenset(box.id for box in boxes)
+    expected_set = frozenset(expected_ids)
+    valid = found_ids & expected_set
     
     return {
         'missing': expected_set - found_ids,
         'extra': found_ids - expected_set,
-        'valid': found_ids & expected_set,
-        'complete': found_ids >= expected_set
+        'valid': valid,
+        'complete': len(valid) == len(expected_set)
     }
 
 
@@ -3,6 +3,8 @@ Prompt template for generating cheat sheet content from lecture documents.
 This prompt is designed to be failsafe and produce consistently parseable output.
 """
 
+import functools
+
 SYSTEM_PROMPT = """You are a study assistant creating exam cheat sheets. You will receive lecture materials and a list of learning objectives (topics). Your job is to extract and condense the key information for each topic into a compact, exam-ready format.
 
 OUTPUT FORMAT RULES (follow exactly):
@@ -139,6 +141,10 @@ RAW TOPICS:
 FORMATTED OUTPUT:"""
 
 
+# Separator between system and user prompt when both are pasted into one chat message
+PROMPT_SEPARATOR = "\n\n---\n\n"
+
+
 def build_prompt(topics: list[str], lecture_content: str) -> tuple[str, str]:
     """
     Build the system and user prompts for cheat sheet generation.
@@ -150,20 +156,51 @@ def build_prompt(topics: list[str], lecture_content: str) -> tuple[str, str]:
     Returns:
         Tuple of (system_prompt, user_prompt)
     """
-    topics_formatted = "\n".join(f"- {topic}" for topic in topics)
+    return _build_prompt_cached(tuple(topics), lecture_content)
+
+
+# Lecture content can be large, so only the last few prompts are kept
+@functools.lru_cache(maxsize=8)
+def _build_prompt_cached(topics: tuple[str, ...], lecture_content: str) -> tuple[str, str]:
+    head, tail = _user_prompt_parts(topics)
+    return SYSTEM_PROMPT, head + lecture_content + tail
+
+
+# The template split around {lecture_content}: the (large) lecture text is
+# concatenated in as-is and never passes through str.format
+_USER_PROMPT_HEAD, _USER_PROMPT_TAIL = USER_PROMPT_TEMPLATE.split("{lecture_content}")
+
+
+@functools.lru_cache(maxsize=32)
+def _user_prompt_parts(topics: tuple[str, ...]) -> tuple[str, str]:
+    """User prompt before and after the lecture content; depends only on the topics."""
+    topics_formatted = "- " + "\n- ".join(topics) if topics else ""
     
     # Calculate estimates for content length guidance
     box_count = max(len(topics), 15)  # Minimum 15 boxes
     word_estimate = box_count * 180  # ~180 words per box average
     
-    user_prompt = USER_PROMPT_TEMPLATE.format(
-        topics=topics_formatted,
-        lecture_content=lecture_content,
-        box_count=box_count,
-        word_estimate=word_estimate
+    return (
+        _USER_PROMPT_HEAD.format(topics=topics_formatted),
+        _USER_PROMPT_TAIL.format(box_count=box_count, word_estimate=word_estimate)
     )
+
+
+def iter_prompt(topics: list[str], lecture_content: str):
+    """
+    Yield the combined copy-paste prompt (system prompt, separator, user prompt) in chunks.
     
-    return SYSTEM_PROMPT, user_prompt
+    Callers can stream the chunks or join them once, instead of concatenating
+    the large lecture content into intermediate strings.
+    
+    Args:
+        topics: List of learning objectives/topics
+        lecture_content: The raw lecture text/notes
+    """
+    system_prompt, user_prompt = build_prompt(topics, lecture_content)
+    yield system_prompt
+    yield PROMPT_SEPARATOR
+    yield user_prompt
 
 
 # Example usage
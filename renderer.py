@@ -6,10 +6,17 @@ Matches the visual style: colored header bars, compact text, variable box height
 
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.units import mm
-from reportlab.lib.colors import HexColor
+from reportlab.lib.colors import Color, HexColor
 from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfmetrics
+import bisect
+import functools
+import io
+import itertools
 import re
-from typing import List
+import sys
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, List, Optional, Union
 
 # Import Box from parser
 try:
@@ -17,6 +24,74 @@ try:
 except ImportError:
     from parser import Box
 
+# Fonts used for drawing and measuring. These are PDF standard fonts, so there
+# is nothing to register; their width tables are loaded once at import so the
+# first request in a worker doesn't pay for it. The names are interned since
+# they are part of every width-cache key.
+FONT_REGULAR = sys.intern("Helvetica")
+FONT_BOLD = sys.intern("Helvetica-Bold")
+FONT_CODE = sys.intern("Courier")
+FONT_NAMES = (FONT_REGULAR, FONT_BOLD, FONT_CODE)
+for _font_name in FONT_NAMES:
+    pdfmetrics.getFont(_font_name)
+
+# Upper bound on memoized string widths per renderer; long-lived renderers
+# (e.g. the web app's measuring renderer) start over once it is reached.
+WIDTH_CACHE_SIZE = 8192
+# Same for per-box and per-content measurements.
+BOX_CACHE_SIZE = 1024
+
+# Inline markup, compiled once for the per-line loops below
+_BOLD_SPLIT_RE = re.compile(r'(\*\*[^*]+\*\*)')
+_NUM_LIST_RE = re.compile(r'^(\d+)\. ')
+
+@dataclass(slots=True, frozen=True)
+class LineToken:
+    """
+    One line of box content, classified once for measuring and drawing.
+    
+    kind is 'fence' (a ``` marker), 'blank', 'code' (inside a fence) or
+    'text'. text is the line without leading whitespace; marker is the list
+    marker ('•' for bullets, e.g. '3.' for numbered items, '' otherwise) and
+    body the text after it.
+    """
+    kind: str
+    text: str = ''
+    indent: float = 0
+    marker: str = ''
+    body: str = ''
+
+
+# One space of indentation, capped at eight
+_INDENT_STEP = 1 * mm
+_INDENT_CAP = 8 * mm
+
+
+@functools.lru_cache(maxsize=1024)
+def _tokenize_content(content: str) -> tuple:
+    """Split box content into LineTokens, tracking code fences in the same pass."""
+    tokens = []
+    in_code_block = False
+    for line in content.split('\n'):
+        stripped = line.lstrip()
+        if stripped.startswith('```'):
+            in_code_block = not in_code_block
+            tokens.append(LineToken('fence', stripped))
+            continue
+        if not stripped:
+            tokens.append(LineToken('blank'))
+            continue
+        
+        indent = min((len(line) - len(stripped)) * _INDENT_STEP, _INDENT_CAP)
+        marker, body = '', stripped
+        if stripped.startswith('• ') or stripped.startswith('- '):
+            marker, body = '•', stripped[2:]
+        elif match := _NUM_LIST_RE.match(stripped):
+            marker, body = f"{match.group(1)}.", stripped[match.end():]
+        tokens.append(LineToken('code' if in_code_block else 'text', stripped, indent, marker, body))
+    return tuple(tokens)
+
+
 # Category colors
 CATEGORY_COLORS = {
     "A": "#0d7377",  # Teal
@@ -26,9 +101,115 @@ CATEGORY_COLORS = {
     "E": "#922b21",  # Red
 }
 
+# Parsed once instead of on every draw call
+_CATEGORY_COLOR_OBJS = {k: HexColor(v) for k, v in CATEGORY_COLORS.items()}
+_WHITE = HexColor("#FFFFFF")
+_BLACK = HexColor("#000000")
+
+
+@dataclass(slots=True, frozen=True)
+class Placement:
+    """Where the packer put a box: top-left corner (x, y) in PDF points on page."""
+    box: Box
+    x: float
+    y: float
+    width: float
+    height: float
+    page: int
+
+
+def _new_skyline(left: float, right: float, top: float, gap: float) -> tuple:
+    """
+    Empty page frontier for the packer.
+    
+    The skyline is kept as two parallel lists: xs, the sorted segment
+    boundaries, and floors, where floors[k] is the bottom of the lowest box
+    placed over [xs[k], xs[k + 1]). Each box claims its width plus the column
+    gap to its right, so the skyline spans [left, right + gap].
+    """
+    return [left, right + gap], [top]
+
+
+def _find_best_position(skyline: tuple, box_w: float, box_h: float, right: float,
+                        bottom: float, gap: float) -> tuple:
+    """
+    Find best position (highest Y, then leftmost X) for a box on the current page.
+    
+    Candidates are the starts of the skyline segments; a box hangs from the
+    lowest floor among the segments it spans. Shared by render() and
+    calculate_layout(). Returns (None, None) if the box doesn't fit anywhere
+    on the page.
+    """
+    xs, floors = skyline
+    n = len(floors)
+    best_x, best_y = None, None
+    
+    for i in range(n):
+        x = xs[i]
+        if x + box_w > right:
+            break
+        
+        # Lowest floor under [x, x + box_w + gap)
+        j = bisect.bisect_left(xs, x + box_w + gap, i + 1, n)
+        y = min(floors[i:j])
+        
+        if y - box_h < bottom:
+            continue
+        if best_y is None or y > best_y:
+            best_x, best_y = x, y
+    
+    return best_x, best_y
+
+
+def _add_to_skyline(skyline: tuple, x: float, box_w: float, box_h: float, y: float, gap: float):
+    """Raise the frontier under a box placed with its top-left corner at (x, y)."""
+    xs, floors = skyline
+    n = len(floors)
+    end = x + box_w + gap
+    
+    # Segments i..j-1 are (partly) covered by the box
+    i = bisect.bisect_right(xs, x, 0, n) - 1
+    j = bisect.bisect_left(xs, end, i + 1, n)
+    
+    new_xs, new_floors = [x], [y - box_h]
+    if xs[i] < x:
+        new_xs.insert(0, xs[i])
+        new_floors.insert(0, floors[i])
+    if end < xs[j]:
+        new_xs.append(end)
+        new_floors.append(floors[j - 1])
+    xs[i:j] = new_xs
+    floors[i:j] = new_floors
+    
+    # Merge neighbours that ended up at the same floor
+    k = max(i - 1, 0)
+    while k < len(floors) - 1 and k <= i + len(new_floors):
+        if floors[k] == floors[k + 1]:
+            del floors[k + 1]
+            del xs[k + 1]
+        else:
+            k += 1
+
+
+_measuring_renderer = None
+
+
+def measure_box(box: Box) -> tuple:
+    """
+    (width, height) of a box, measured with a renderer private to this process.
+    
+    Module-level so it can run in worker processes, e.g.
+    ProcessPoolExecutor().map(measure_box, boxes).
+    """
+    global _measuring_renderer
+    if _measuring_renderer is None:
+        _measuring_renderer = CheatSheetRenderer(io.BytesIO())
+    return _measuring_renderer.measure_box(box)
+
 
 class CheatSheetRenderer:
-    def __init__(self, output_path: str, num_columns: int = 3):
+    def __init__(self, output_path: Union[str, BinaryIO], num_columns: int = 3):
+        # A filename, or any writable binary file object (e.g. io.BytesIO)
         self.output_path = output_path
         self.page_width, self.page_height = landscape(A4)
         self.margin = 4 * mm
@@ -48,26 +229,103 @@ class CheatSheetRenderer:
         self.code_font_size = 4
         self.line_height = 1.6 * mm
         
+        # Per-line spacing in points, so the line loops don't convert from mm
+        self.blank_line_height = 0.6 * mm
+        self.est_blank_line_height = 0.8 * mm  # height estimate is a little generous
+        self.bullet_width = 2 * mm
+        self.number_width = 2.5 * mm
+        self.est_bullet_width = 3 * mm
+        self.est_number_width = 4 * mm
+        
         self.c = None  # canvas
         
-    def _get_color(self, category: str) -> str:
-        return CATEGORY_COLORS.get(category, CATEGORY_COLORS["A"])
+        # (font, size, text) -> width. Standard font metrics don't depend on
+        # the canvas, so this survives across render()/calculate_layout() calls.
+        self._width_cache = {}
+        # Box -> (width, height) from measure_box(), so calculate_layout(),
+        # render() and render_with_layout() on the same boxes measure each one
+        # only once. Content measurements are keyed by the content alone, so
+        # boxes that repeat a template under another id or title share them:
+        # content -> widest line, and (content, width) -> box height.
+        self._box_dims_cache = {}
+        self._content_width_cache = {}
+        self._content_height_cache = {}
+        # (header, max_width) -> header as drawn
+        self._header_cache = {}
+        # (_pack_key(), pages) from the last calculate_layout() call
+        self._last_pack = None
+        # (box, (width, height)) added since begin()
+        self._pending = []
+        
+    def _get_color(self, category: str) -> Color:
+        return _CATEGORY_COLOR_OBJS.get(category, _CATEGORY_COLOR_OBJS["A"])
+    
+    def _sw(self, text: str, font: str, size: float) -> float:
+        """Memoized string width; standard font metrics need no canvas."""
+        key = (font, size, text)
+        width = self._width_cache.get(key)
+        if width is None:
+            if len(self._width_cache) >= WIDTH_CACHE_SIZE:
+                self._width_cache.clear()
+            width = pdfmetrics.stringWidth(text, font, size)
+            self._width_cache[key] = width
+        return width
+    
+    def _fit_header(self, header: str, max_width: float) -> str:
+        """
+        Truncate a header with "..." to fit max_width, never below 20 characters.
+        
+        Same result as chopping a character at a time, but binary-searches
+        the cut since the width only grows with the prefix length.
+        """
+        key = (header, round(max_width, 2))
+        fitted = self._header_cache.get(key)
+        if fitted is not None:
+            return fitted
+        
+        font, size = FONT_BOLD, self.header_font_size
+        if len(header) <= 20 or self._sw(header, font, size) <= max_width:
+            fitted = header
+        else:
+            # Largest cut k in [17, len - 4] with header[:k] + "..." fitting;
+            # 17 (20 characters with the ellipsis) if none does
+            lo, hi = 17, len(header) - 4
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if self._sw(header[:mid] + "...", font, size) <= max_width:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            fitted = header[:lo] + "..."
+        
+        if len(self._header_cache) >= BOX_CACHE_SIZE:
+            self._header_cache.clear()
+        self._header_cache[key] = fitted
+        return fitted
     
     def _wrap_text(self, text: str, max_width: float, font_name: str, font_size: float) -> List[str]:
-        """Simple word wrapping."""
+        """Simple word wrapping, adding up word widths instead of re-measuring the line."""
         words = text.split()
+        # Most lines fit as they are; collapsing runs of spaces only narrows them
+        if self._sw(text, font_name, font_size) <= max_width:
+            return [' '.join(words)] if words else ['']
+        
+        space_width = self._sw(' ', font_name, font_size)
         lines = []
         current_line = []
+        current_width = 0.0
         
         for word in words:
-            test_line = ' '.join(current_line + [word])
-            width = self.c.stringWidth(test_line, font_name, font_size)
+            word_width = self._sw(word, font_name, font_size)
+            width = current_width + space_width + word_width if current_line else word_width
             if width <= max_width:
                 current_line.append(word)
+                current_width = width
             else:
                 if current_line:
                     lines.append(' '.join(current_line))
                 current_line = [word]
+                current_width = word_width
         
         if current_line:
             lines.append(' '.join(current_line))
@@ -76,36 +334,28 @@ class CheatSheetRenderer:
     
     def _estimate_content_height(self, content: str, available_width: float) -> float:
         """Estimate height needed for content."""
-        lines = content.split('\n')
         total_height = 0
-        in_code_block = False
         
-        for line in lines:
-            # Skip code fence markers but track state
-            if line.strip().startswith('```'):
-                in_code_block = not in_code_block
+        for tok in _tokenize_content(content):
+            if tok.kind == 'fence':
                 continue
             
-            if not line.strip():
-                total_height += 0.8 * mm  # minimal blank line spacing
+            if tok.kind == 'blank':
+                total_height += self.est_blank_line_height  # minimal blank line spacing
                 continue
             
-            # Calculate indent
-            stripped = line.lstrip()
-            indent = min((len(line) - len(stripped)) * 1 * mm, 8 * mm)  # cap indent
-            
-            # Check for bullet/number prefix
+            # Bullet/number prefix
             prefix_width = 0
-            if stripped.startswith('• ') or stripped.startswith('- '):
-                prefix_width = 3 * mm
-            elif re.match(r'^\d+\. ', stripped):
-                prefix_width = 4 * mm
+            if tok.marker == '•':
+                prefix_width = self.est_bullet_width
+            elif tok.marker:
+                prefix_width = self.est_number_width
             
             # Wrap calculation
-            text_width = available_width - self.box_padding * 2 - indent - prefix_width
+            text_width = available_width - self.box_padding * 2 - tok.indent - prefix_width
             # Remove bold markers for width calculation
-            clean_text = re.sub(r'\*\*([^*]+)\*\*', r'\1', stripped)
-            wrapped = self._wrap_text(clean_text, text_width, "Helvetica", self.content_font_size)
+            clean_text = tok.text.replace('**', '')
+            wrapped = self._wrap_text(clean_text, text_width, FONT_REGULAR, self.content_font_size)
             total_height += len(wrapped) * self.line_height
         
         return total_height
@@ -114,142 +364,155 @@ class CheatSheetRenderer:
         """Estimate total box height."""
         if width is None:
             width = self.column_width
-        content_height = self._estimate_content_height(box.content, width)
-        return self.header_height + content_height + self.box_padding * 2
+        key = (box.content, round(width, 2))
+        height = self._content_height_cache.get(key)
+        if height is None:
+            if len(self._content_height_cache) >= BOX_CACHE_SIZE:
+                self._content_height_cache.clear()
+            content_height = self._estimate_content_height(box.content, width)
+            height = self.header_height + content_height + self.box_padding * 2
+            self._content_height_cache[key] = height
+        return height
     
     def _calculate_box_width(self, box: Box) -> float:
         """Calculate width needed for box based on longest line."""
-        max_width = 0
-        
         # Check title width
         title_text = f"{box.id} {box.title}"
-        title_width = self.c.stringWidth(title_text, "Helvetica-Bold", self.header_font_size) + 3 * mm
-        max_width = max(max_width, title_width)
+        title_width = self._sw(title_text, FONT_BOLD, self.header_font_size) + 3 * mm
+        max_width = max(title_width, self._content_width(box.content))
         
-        # Check content lines
-        for line in box.content.split('\n'):
-            if line.strip().startswith('```'):
-                continue
-            stripped = line.strip()
-            if not stripped:
+        # Clamp to reasonable bounds
+        min_width = 25 * mm
+        max_allowed = (self.page_width - 2 * self.margin) / 2  # Max half page
+        return max(min_width, min(max_width + 2 * mm, max_allowed))
+    
+    def _content_width(self, content: str) -> float:
+        """Width of the widest content line, padding included (0 if none)."""
+        max_width = self._content_width_cache.get(content)
+        if max_width is not None:
+            return max_width
+        
+        max_width = 0
+        for tok in _tokenize_content(content):
+            if tok.kind in ('fence', 'blank'):
                 continue
             
-            # Remove bold markers for width calculation
-            clean = re.sub(r'\*\*([^*]+)\*\*', r'\1', stripped)
-            
-            # Calculate indent contribution
-            indent = min((len(line) - len(line.lstrip())) * 1 * mm, 8 * mm)
-            
             # Check for bullet prefix
             prefix_width = 0
-            if clean.startswith('• ') or clean.startswith('- '):
-                prefix_width = 2 * mm
-                clean = clean[2:]
-            elif re.match(r'^\d+\. ', clean):
-                prefix_width = 2.5 * mm
-                clean = re.sub(r'^\d+\. ', '', clean)
+            if tok.marker == '•':
+                prefix_width = self.bullet_width
+            elif tok.marker:
+                prefix_width = self.number_width
             
-            line_width = self.c.stringWidth(clean, "Helvetica", self.content_font_size)
-            total_line_width = indent + prefix_width + line_width + self.box_padding * 2
+            # Remove bold markers for width calculation
+            clean = tok.body.rstrip().replace('**', '')
+            
+            line_width = self._sw(clean, FONT_REGULAR, self.content_font_size)
+            total_line_width = tok.indent + prefix_width + line_width + self.box_padding * 2
             max_width = max(max_width, total_line_width)
         
-        # Clamp to reasonable bounds
-        min_width = 25 * mm
-        max_allowed = (self.page_width - 2 * self.margin) / 2  # Max half page
-        return max(min_width, min(max_width + 2 * mm, max_allowed))
+        if len(self._content_width_cache) >= BOX_CACHE_SIZE:
+            self._content_width_cache.clear()
+        self._content_width_cache[content] = max_width
+        return max_width
     
-    def _draw_text_with_bold(self, text: str, x: float, y: float, max_width: float) -> float:
-        """Draw text with **bold** support. Returns lines used."""
-        # Split by bold markers
-        parts = re.split(r'(\*\*[^*]+\*\*)', text)
-        current_x = x
-        
-        for part in parts:
+    def _draw_text_with_bold(self, text_obj, text: str):
+        """Append text to a text object at its cursor, with **bold** support."""
+        for part in _BOLD_SPLIT_RE.split(text):
             if not part:
                 continue
             if part.startswith('**') and part.endswith('**'):
-                self.c.setFont("Helvetica-Bold", self.content_font_size)
-                clean = part[2:-2]
+                self._set_text_font(text_obj, FONT_BOLD, self.content_font_size)
+                text_obj.textOut(part[2:-2])
             else:
-                self.c.setFont("Helvetica", self.content_font_size)
-                clean = part
+                self._set_text_font(text_obj, FONT_REGULAR, self.content_font_size)
+                text_obj.textOut(part)
+    
+    @staticmethod
+    def _set_text_font(text_obj, font: str, size: float):
+        """setFont on a text object, skipped when the font is already current."""
+        if text_obj._fontname != font or text_obj._fontsize != size:
+            text_obj.setFont(font, size)
+    
+    def _draw_content(self, box: Box, x: float, y: float, width: float, bottom: float = None):
+        """
+        Draw box content as a single PDF text object, first baseline at y.
+        
+        Stops at the first line whose baseline falls below bottom, if given.
+        """
+        text_obj = self.c.beginText()
+        
+        for tok in _tokenize_content(box.content):
+            # Stop if we've exceeded the box height
+            if bottom is not None and y < bottom:
+                break
+            
+            # Code fence markers only switch styling, already applied to the tokens
+            if tok.kind == 'fence':
+                continue
+            
+            if tok.kind == 'blank':
+                y -= self.blank_line_height
+                continue
+            
+            text_x = x + self.box_padding + tok.indent
+            
+            # Code block styling
+            if tok.kind == 'code':
+                self._set_text_font(text_obj, FONT_CODE, self.code_font_size)
+                text_obj.setTextOrigin(text_x, y)
+                text_obj.textOut(tok.text)
+                y -= self.line_height
+                continue
+            
+            # Handle bullets
+            if tok.marker:
+                self._set_text_font(text_obj, FONT_REGULAR, self.content_font_size)
+                text_obj.setTextOrigin(text_x, y)
+                text_obj.textOut(tok.marker)
+                text_x += self.bullet_width if tok.marker == '•' else self.number_width
             
-            self.c.drawString(current_x, y, clean)
-            current_x += self.c.stringWidth(clean, self.c._fontname, self.content_font_size)
+            # Draw text
+            text_obj.setTextOrigin(text_x, y)
+            self._draw_text_with_bold(text_obj, tok.body)
+            y -= self.line_height
         
-        return 1
+        self.c.drawText(text_obj)
     
-    def _draw_box(self, box: Box, x: float, y: float, width: float = None) -> float:
-        """Draw a single box. Returns actual height used."""
+    def _draw_box(self, box: Box, x: float, y: float, width: float = None,
+                  height: float = None) -> float:
+        """
+        Draw a single box. Returns actual height used.
+        
+        height is estimated from the content unless the caller already knows it.
+        """
         c = self.c
         color = self._get_color(box.category)
         if width is None:
             width = self.column_width
         
-        # Calculate height
-        height = self._estimate_box_height(box, width)
+        if height is None:
+            height = self._estimate_box_height(box, width)
         
         # Header background
-        c.setFillColor(HexColor(color))
+        c.setFillColor(color)
         c.rect(x, y - self.header_height, width, self.header_height, fill=True, stroke=False)
         
         # Header text
-        c.setFillColor(HexColor("#FFFFFF"))
-        c.setFont("Helvetica-Bold", self.header_font_size)
-        header = f"{box.id} {box.title}"
-        # Truncate if needed
-        max_header_width = width - 2 * mm
-        while c.stringWidth(header, "Helvetica-Bold", self.header_font_size) > max_header_width and len(header) > 20:
-            header = header[:-4] + "..."
+        c.setFillColor(_WHITE)
+        c.setFont(FONT_BOLD, self.header_font_size)
+        header = self._fit_header(f"{box.id} {box.title}", width - 2 * mm)
         c.drawString(x + 1 * mm, y - self.header_height + 0.9 * mm, header)
         
         # Box border
-        c.setStrokeColor(HexColor(color))
+        c.setStrokeColor(color)
         c.setLineWidth(0.4)
         c.rect(x, y - height, width, height, fill=False, stroke=True)
         
         # Content
-        c.setFillColor(HexColor("#000000"))
+        c.setFillColor(_BLACK)
         content_y = y - self.header_height - self.box_padding - self.line_height * 0.7
-        in_code_block = False
-        
-        for line in box.content.split('\n'):
-            # Handle code fence markers
-            if line.strip().startswith('```'):
-                in_code_block = not in_code_block
-                continue
-            
-            if not line.strip():
-                content_y -= 0.6 * mm
-                continue
-            
-            stripped = line.lstrip()
-            indent = min((len(line) - len(stripped)) * 1 * mm, 8 * mm)
-            text_x = x + self.box_padding + indent
-            
-            # Code block styling
-            if in_code_block:
-                c.setFont("Courier", self.code_font_size)
-                c.drawString(text_x, content_y, stripped)
-                content_y -= self.line_height
-                continue
-            
-            # Handle bullets
-            if stripped.startswith('• ') or stripped.startswith('- '):
-                c.setFont("Helvetica", self.content_font_size)
-                c.drawString(text_x, content_y, "•")
-                text_x += 2 * mm
-                stripped = stripped[2:]
-            elif re.match(r'^(\d+)\. ', stripped):
-                match = re.match(r'^(\d+)\. ', stripped)
-                c.setFont("Helvetica", self.content_font_size)
-                c.drawString(text_x, content_y, f"{match.group(1)}.")
-                text_x += 2.5 * mm
-                stripped = stripped[match.end():]
-            
-            # Draw text (simple, single line for now)
-            self._draw_text_with_bold(stripped, text_x, content_y, width - self.box_padding * 2 - indent)
-            content_y -= self.line_height
+        self._draw_content(box, x, content_y, width)
         
         return height
     
@@ -258,20 +521,19 @@ class CheatSheetRenderer:
         if not boxes:
             return self.num_columns
         
-        # Sample line lengths from content
-        all_lines = []
+        # Running total of non-blank line lengths, without formatting markers
+        total_len = 0
+        line_count = 0
         for box in boxes:
-            for line in box.content.split('\n'):
-                stripped = line.strip()
-                if stripped:
-                    # Remove formatting markers for length calc
-                    clean = re.sub(r'\*\*([^*]+)\*\*', r'\1', stripped)
-                    all_lines.append(len(clean))
-        
-        if not all_lines:
+            for tok in _tokenize_content(box.content):
+                if tok.kind != 'blank':
+                    total_len += len(tok.text.rstrip().replace('**', ''))
+                    line_count += 1
+        
+        if not line_count:
             return self.num_columns
         
-        avg_len = sum(all_lines) / len(all_lines)
+        avg_len = total_len / line_count
         
         # Heuristic: shorter lines = more columns
         # avg ~20 chars -> 4 cols, ~40 chars -> 3 cols, ~60+ chars -> 2 cols
@@ -282,164 +544,134 @@ class CheatSheetRenderer:
         else:
             return 2
     
-    def render(self, boxes: List[Box], sort_by_category: bool = True, auto_columns: bool = True):
-        """Render all boxes to PDF with greedy bin-packing layout."""
-        self.c = canvas.Canvas(self.output_path, pagesize=landscape(A4))
+    def measure_box(self, box: Box) -> tuple:
+        """(width, height) the box takes on the page."""
+        dims = self._box_dims_cache.get(box)
+        if dims is None:
+            if len(self._box_dims_cache) >= BOX_CACHE_SIZE:
+                self._box_dims_cache.clear()
+            box_width = self._calculate_box_width(box)
+            dims = box_width, self._estimate_box_height(box, box_width)
+            self._box_dims_cache[box] = dims
+        return dims
+    
+    def begin(self):
+        """
+        Start an incremental render: call add_box() for each box as it becomes
+        available (e.g. while AI output is streaming in), then finish().
+        Measuring needs no canvas; finish() opens one to draw.
+        """
+        self._pending = []
+    
+    def add_box(self, box: Box):
+        """Measure a box right away, leaving only placement and drawing for finish()."""
+        self._pending.append((box, self.measure_box(box)))
+    
+    def finish(self, sort_by_category: bool = True):
+        """Lay out and draw every added box, exactly as render() would."""
+        boxes = [box for box, _ in self._pending]
+        sizes = [size for _, size in self._pending]
+        self._pending = []
+        self.render(boxes, sort_by_category, sizes=sizes)
+    
+    def _pack_pages(self, boxes: List[Box], sort_by_category: bool = True,
+                    sizes: Optional[List[tuple]] = None) -> Iterator[List[Placement]]:
+        """
+        Place boxes with the skyline packer, yielding each page's placements
+        as soon as the page is full; shared by render() and calculate_layout().
         
+        Only the current page is held, so render() can draw a page before the
+        next one is packed.
+        """
+        items = list(zip(boxes, sizes or [None] * len(boxes)))
         if sort_by_category:
-            boxes = sorted(boxes, key=lambda b: (b.category, b.id))
+            items.sort(key=lambda item: (item[0].category, item[0].id))
         
         page_top = self.page_height - self.margin
         page_bottom = self.margin
         page_right = self.page_width - self.margin
         
-        # Track placed boxes as rectangles: (x, y_top, width, height)
-        placed = []
-        
-        def find_best_position(box_w, box_h):
-            """Find best position (highest Y, then leftmost X) for a box."""
-            best_x, best_y = None, None
-            
-            # Try positions: start from top, scan left to right
-            # Check Y levels from top down
-            y_levels = [page_top]
-            for (px, py, pw, ph) in placed:
-                y_levels.append(py - ph)  # bottom of each placed box
-            y_levels = sorted(set(y_levels), reverse=True)
-            
-            for y in y_levels:
-                if y - box_h < page_bottom:
-                    continue
-                
-                # Try X positions from left
-                x_positions = [self.margin]
-                for (px, py, pw, ph) in placed:
-                    x_positions.append(px + pw + self.column_gap)
-                x_positions = sorted(set(x_positions))
-                
-                for x in x_positions:
-                    if x + box_w > page_right:
-                        continue
-                    
-                    # Check if this position overlaps any placed box
-                    overlaps = False
-                    for (px, py, pw, ph) in placed:
-                        # Check overlap: box at (x, y-box_h to y) vs placed at (px, py-ph to py)
-                        if not (x + box_w + self.column_gap <= px or x >= px + pw + self.column_gap or
-                                y - box_h >= py or y <= py - ph):
-                            overlaps = True
-                            break
-                    
-                    if not overlaps:
-                        if best_y is None or y > best_y or (y == best_y and x < best_x):
-                            best_x, best_y = x, y
-                
-                if best_x is not None:
-                    break
-            
-            return best_x, best_y
+        # Frontier of the boxes placed so far on the current page
+        skyline = _new_skyline(self.margin, page_right, page_top, self.column_gap)
+        page = []
+        page_num = 0
         
-        for box in boxes:
-            box_width = self._calculate_box_width(box)
-            box_height = self._estimate_box_height(box, box_width)
+        for box, size in items:
+            box_width, box_height = size or self.measure_box(box)
             
-            x, y = find_best_position(box_width, box_height)
+            x, y = _find_best_position(skyline, box_width, box_height, page_right,
+                                       page_bottom, self.column_gap)
             
             if x is None:
                 # New page
-                self.c.showPage()
-                placed = []
+                yield page
+                page = []
+                page_num += 1
+                skyline = _new_skyline(self.margin, page_right, page_top, self.column_gap)
                 x, y = self.margin, page_top
             
-            self._draw_box(box, x, y, box_width)
-            placed.append((x, y, box_width, box_height))
+            _add_to_skyline(skyline, x, box_width, box_height, y, self.column_gap)
+            page.append(Placement(box, x, y, box_width, box_height, page_num))
+        
+        if page:
+            yield page
+    
+    @staticmethod
+    def _pack_key(boxes: List[Box], sort_by_category: bool, sizes: Optional[List[tuple]]) -> tuple:
+        """Cache key for a packing; caller-supplied sizes change the placements."""
+        return tuple(boxes), tuple(sizes) if sizes else None, sort_by_category
+    
+    def render(self, boxes: List[Box], sort_by_category: bool = True, auto_columns: bool = True,
+               sizes: Optional[List[tuple]] = None):
+        """
+        Render all boxes to PDF with greedy bin-packing layout.
+        
+        sizes optionally gives each box's (width, height) from measure_box(),
+        in the same order as boxes, e.g. when measured in parallel.
+        """
+        self.c = canvas.Canvas(self.output_path, pagesize=landscape(A4))
+        
+        # Reuse the pages kept by a calculate_layout() preview of the same boxes;
+        # otherwise stream them straight from the packer without keeping them
+        key = self._pack_key(boxes, sort_by_category, sizes)
+        if self._last_pack is not None and self._last_pack[0] == key:
+            pages = self._last_pack[1]
+        else:
+            pages = self._pack_pages(boxes, sort_by_category, sizes)
+        
+        for page_num, placements in enumerate(pages):
+            if page_num > 0:
+                self.c.showPage()
+            for p in placements:
+                self._draw_box(p.box, p.x, p.y, p.width, p.height)
         
         self.c.save()
-        print(f"✓ PDF saved: {self.output_path}")
+        if isinstance(self.output_path, str):
+            print(f"✓ PDF saved: {self.output_path}")
 
     def calculate_layout(self, boxes: List[Box], sort_by_category: bool = True) -> list:
         """Calculate box positions and sizes without rendering - for editor preview."""
-        # Need a temporary canvas for string width calculations
-        import io
-        temp_buffer = io.BytesIO()
-        self.c = canvas.Canvas(temp_buffer, pagesize=landscape(A4))
+        # Convert PDF coordinates to editor coordinates
+        # PDF: bottom-left origin, Y up. Editor: top-left origin, Y down
+        scale_x = 1123 / self.page_width
+        scale_y = 794 / self.page_height
         
-        if sort_by_category:
-            boxes = sorted(boxes, key=lambda b: (b.category, b.id))
-        
-        page_top = self.page_height - self.margin
-        page_bottom = self.margin
-        page_right = self.page_width - self.margin
+        # Keep the pages, so exporting the previewed boxes doesn't pack them again
+        pages = list(self._pack_pages(boxes, sort_by_category))
+        self._last_pack = (self._pack_key(boxes, sort_by_category, None), pages)
         
-        placed = []
         layout_result = []
-        current_page = 0
-        
-        def find_best_position(box_w, box_h):
-            best_x, best_y = None, None
-            y_levels = [page_top]
-            for (px, py, pw, ph, _) in placed:
-                y_levels.append(py - ph)
-            y_levels = sorted(set(y_levels), reverse=True)
-            
-            for y in y_levels:
-                if y - box_h < page_bottom:
-                    continue
-                x_positions = [self.margin]
-                for (px, py, pw, ph, _) in placed:
-                    x_positions.append(px + pw + self.column_gap)
-                x_positions = sorted(set(x_positions))
-                
-                for x in x_positions:
-                    if x + box_w > page_right:
-                        continue
-                    overlaps = False
-                    for (px, py, pw, ph, _) in placed:
-                        if not (x + box_w + self.column_gap <= px or x >= px + pw + self.column_gap or
-                                y - box_h >= py or y <= py - ph):
-                            overlaps = True
-                            break
-                    if not overlaps:
-                        if best_y is None or y > best_y or (y == best_y and x < best_x):
-                            best_x, best_y = x, y
-                if best_x is not None:
-                    break
-            return best_x, best_y
-        
-        for box in boxes:
-            box_width = self._calculate_box_width(box)
-            box_height = self._estimate_box_height(box, box_width)
-            
-            x, y = find_best_position(box_width, box_height)
-            
-            if x is None:
-                current_page += 1
-                placed = []
-                x, y = self.margin, page_top
-            
-            placed.append((x, y, box_width, box_height, box.id))
-            
-            # Convert PDF coordinates to editor coordinates
-            # PDF: bottom-left origin, Y up. Editor: top-left origin, Y down
-            scale_x = 1123 / self.page_width
-            scale_y = 794 / self.page_height
-            
-            editor_x = x * scale_x
-            # Convert Y: PDF y is from bottom, editor y is from top
-            editor_y = (self.page_height - y) * scale_y + (current_page * 794)
-            editor_width = box_width * scale_x
-            editor_height = box_height * scale_y
-            
+        for p in itertools.chain.from_iterable(pages):
             layout_result.append({
-                'id': box.id,
-                'x': editor_x,
-                'y': editor_y,
-                'width': editor_width,
-                'height': editor_height,
-                'page': current_page
+                'id': p.box.id,
+                'x': p.x * scale_x,
+                # Convert Y: PDF y is from bottom, editor y is from top
+                'y': (self.page_height - p.y) * scale_y + (p.page * 794),
+                'width': p.width * scale_x,
+                'height': p.height * scale_y,
+                'page': p.page
             })
         
-        self.c = None
         return layout_result
 
     def render_with_layout(self, boxes: List[Box], layout: list):
@@ -490,7 +722,8 @@ class CheatSheetRenderer:
                 self._draw_box(box, x, y, width)
         
         self.c.save()
-        print(f"✓ PDF saved with custom layout: {self.output_path}")
+        if isinstance(self.output_path, str):
+            print(f"✓ PDF saved with custom layout: {self.output_path}")
 
     def _draw_box_fixed_size(self, box: Box, x: float, y: float, width: float, height: float) -> float:
         """Draw a box with fixed dimensions (from editor)."""
@@ -498,71 +731,25 @@ class CheatSheetRenderer:
         color = self._get_color(box.category)
         
         # Header background
-        c.setFillColor(HexColor(color))
+        c.setFillColor(color)
         c.rect(x, y - self.header_height, width, self.header_height, fill=True, stroke=False)
         
         # Header text
-        c.setFillColor(HexColor("#FFFFFF"))
-        c.setFont("Helvetica-Bold", self.header_font_size)
-        header = f"{box.id} {box.title}"
-        # Truncate if needed
-        max_header_width = width - 2 * mm
-        while c.stringWidth(header, "Helvetica-Bold", self.header_font_size) > max_header_width and len(header) > 20:
-            header = header[:-4] + "..."
+        c.setFillColor(_WHITE)
+        c.setFont(FONT_BOLD, self.header_font_size)
+        header = self._fit_header(f"{box.id} {box.title}", width - 2 * mm)
         c.drawString(x + 1 * mm, y - self.header_height + 0.9 * mm, header)
         
         # Box border
-        c.setStrokeColor(HexColor(color))
+        c.setStrokeColor(color)
         c.setLineWidth(0.4)
         c.rect(x, y - height, width, height, fill=False, stroke=True)
         
         # Content - clip to available space
-        c.setFillColor(HexColor("#000000"))
+        c.setFillColor(_BLACK)
         content_y = y - self.header_height - self.box_padding - self.line_height * 0.7
         content_bottom = y - height + self.box_padding
-        in_code_block = False
-        
-        for line in box.content.split('\n'):
-            # Stop if we've exceeded the box height
-            if content_y < content_bottom:
-                break
-            
-            # Handle code fence markers
-            if line.strip().startswith('```'):
-                in_code_block = not in_code_block
-                continue
-            
-            if not line.strip():
-                content_y -= 0.6 * mm
-                continue
-            
-            stripped = line.lstrip()
-            indent = min((len(line) - len(stripped)) * 1 * mm, 8 * mm)
-            text_x = x + self.box_padding + indent
-            
-            # Code block styling
-            if in_code_block:
-                c.setFont("Courier", self.code_font_size)
-                c.drawString(text_x, content_y, stripped)
-                content_y -= self.line_height
-                continue
-            
-            # Handle bullets
-            if stripped.startswith('• ') or stripped.startswith('- '):
-                c.setFont("Helvetica", self.content_font_size)
-                c.drawString(text_x, content_y, "•")
-                text_x += 2 * mm
-                stripped = stripped[2:]
-            elif re.match(r'^(\d+)\. ', stripped):
-                match = re.match(r'^(\d+)\. ', stripped)
-                c.setFont("Helvetica", self.content_font_size)
-                c.drawString(text_x, content_y, f"{match.group(1)}.")
-                text_x += 2.5 * mm
-                stripped = stripped[match.end():]
-            
-            # Draw text
-            self._draw_text_with_bold(stripped, text_x, content_y, width - self.box_padding * 2 - indent)
-            content_y -= self.line_height
+        self._draw_content(box, x, content_y, width, content_bottom)
         
         return height
 
@@ -0,0 +1,1014 @@
+// Show selected files
+const lectureFilesInput = document.getElementById('lecture-files');
+if (lectureFilesInput) {
+    lectureFilesInput.addEventListener('change', function(e) {
+        const fileList = document.getElementById('file-list');
+        const files = Array.from(e.target.files);
+        if (files.length) {
+            fileList.innerHTML = 'Selected: ' + files.map(f => '<span>' + f.name + '</span>').join('');
+        } else {
+            fileList.innerHTML = '';
+        }
+    });
+}
+
+function showTab(tab) {
+    document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
+    document.querySelectorAll('.tabs .tab').forEach(t => {
+        if (t.textContent.toLowerCase().includes(tab)) t.classList.add('active');
+    });
+    document.getElementById('tab-ai').classList.toggle('hidden', tab !== 'ai');
+    document.getElementById('tab-prompt').classList.toggle('hidden', tab !== 'prompt');
+    document.getElementById('tab-format').classList.toggle('hidden', tab !== 'format');
+}
+
+// Formatter prompt around the user's raw topics (mirrors TOPIC_FORMATTER_PROMPT in prompt_template.py)
+const FORMAT_PROMPT_HEAD = `You are a formatting assistant. Your ONLY job is to reformat learning objectives (topics) into a standardized format.
+
+CRITICAL RULES:
+1. DO NOT change, rephrase, summarize, or modify the content in ANY way
+2. DO NOT add explanations, interpretations, or additional information
+3. DO NOT remove or skip any topics
+4. PRESERVE the exact original wording - copy it character by character
+5. Only add the ID prefix (A1, A2, B1, etc.) and proper formatting
+
+INPUT: Raw topics in any format (numbered, bulleted, grouped by topic, etc.)
+
+OUTPUT FORMAT:
+- One topic per line
+- Format: "ID: Original text exactly as given"
+- Group A = first topic/section, B = second topic/section, etc.
+- Number within each group: A1, A2, A3... B1, B2, B3... etc.
+
+EXAMPLE INPUT:
+"Module 1 - HTML Basics:
+- Understand HTML document structure
+- Know semantic elements
+Module 2 - CSS:
+- Apply Flexbox layouts
+- Use CSS Grid"
+
+EXAMPLE OUTPUT:
+A1: Understand HTML document structure
+A2: Know semantic elements
+B1: Apply Flexbox layouts
+B2: Use CSS Grid
+
+Now format the following topics. Remember: DO NOT change any wording, only add IDs and format as shown above.
+
+RAW TOPICS:
+`;
+const FORMAT_PROMPT_TAIL = `
+
+FORMATTED OUTPUT:`;
+
+function formatTopics() {
+    const raw = document.getElementById('raw-topics').value;
+    const result = document.getElementById('result');
+    
+    if (!raw.trim()) {
+        result.innerHTML = '<div class="error">Please paste raw topics first</div>';
+        return;
+    }
+    
+    // Only the raw topics vary; the surrounding prompt text is constant
+    const prompt = FORMAT_PROMPT_HEAD + raw + FORMAT_PROMPT_TAIL;
+    
+    document.getElementById('format-output').textContent = prompt;
+    document.getElementById('format-result').classList.remove('hidden');
+    result.innerHTML = '<div class="success">✓ Prompt generated! Copy it to Claude/ChatGPT.</div>';
+}
+
+function copyFormatPrompt() {
+    const text = document.getElementById('format-output').textContent;
+    navigator.clipboard.writeText(text);
+    document.getElementById('result').innerHTML = '<div class="success">✓ Copied to clipboard!</div>';
+}
+
+function downloadBlob(blob, filename) {
+    const url = URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = filename;
+    a.click();
+    // Release the blob once the download has had time to start
+    setTimeout(() => URL.revokeObjectURL(url), 1000);
+}
+
+async function generatePDF() {
+    const aiOutput = document.getElementById('ai-output').value;
+    const result = document.getElementById('result');
+    
+    if (!aiOutput.trim()) {
+        result.innerHTML = '<div class="error">Please paste AI output first</div>';
+        return;
+    }
+    
+    result.innerHTML = '<div class="success">Generating PDF...</div>';
+    
+    try {
+        const response = await fetch('/generate', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ ai_output: aiOutput })
+        });
+        
+        if (response.ok) {
+            downloadBlob(await response.blob(), 'cheatsheet.pdf');
+            result.innerHTML = '<div class="success">✓ PDF downloaded!</div>';
+        } else {
+            const err = await response.json();
+            result.innerHTML = '<div class="error">Error: ' + err.error + '</div>';
+        }
+    } catch (e) {
+        result.innerHTML = '<div class="error">Error: ' + e.message + '</div>';
+    }
+}
+
+async function generatePrompt() {
+    const topics = document.getElementById('topics').value;
+    const manualContent = document.getElementById('lecture-content').value;
+    const filesInput = document.getElementById('lecture-files');
+    const result = document.getElementById('result');
+    const btn = document.getElementById('prompt-btn');
+    
+    if (!topics.trim()) {
+        result.innerHTML = '<div class="error">Please enter topics</div>';
+        return;
+    }
+    
+    btn.disabled = true;
+    btn.textContent = 'Processing...';
+    result.innerHTML = '<div class="info">Extracting text from documents...</div>';
+    
+    try {
+        const formData = new FormData();
+        formData.append('topics', topics);
+        formData.append('manual_content', manualContent);
+        
+        // Add files
+        for (const file of filesInput.files) {
+            formData.append('files', file);
+        }
+        
+        const response = await fetch('/prompt', {
+            method: 'POST',
+            body: formData
+        });
+        
+        const data = await response.json();
+        
+        if (data.error) {
+            result.innerHTML = '<div class="error">' + data.error + '</div>';
+        } else {
+            document.getElementById('prompt-output').textContent = data.prompt;
+            document.getElementById('prompt-result').classList.remove('hidden');
+            result.innerHTML = '<div class="success">✓ Prompt generated! Copy it to Claude/ChatGPT.</div>';
+        }
+    } catch (e) {
+        result.innerHTML = '<div class="error">Error: ' + e.message + '</div>';
+    } finally {
+        btn.disabled = false;
+        btn.textContent = 'Generate Prompt for AI';
+    }
+}
+
+function copyPrompt() {
+    const text = document.getElementById('prompt-output').textContent;
+    navigator.clipboard.writeText(text);
+    document.getElementById('result').innerHTML = '<div class="success">✓ Copied to clipboard!</div>';
+}
+
+// ========== Editor View ==========
+// Page dimensions (A4 Landscape in pixels at 96 DPI)
+const PAGE_WIDTH = 1123;  // 297mm
+const PAGE_HEIGHT = 794;  // 210mm
+const MARGIN = 15;
+const GRID_SIZE = 10;
+
+let editorBoxes = [];
+
+// Every editor box is created here with the same fields in the same order, so
+// the drag/resize/layout loops only ever see one object shape
+function makeEditorBox(id, title, content, category, x, y, width, height) {
+    return { id, title, content, category, x, y, width, height, baseHeight: height };
+}
+let selectedBox = null;
+let isDragging = false;
+let isResizing = false;
+let dragOffset = { x: 0, y: 0 };
+let currentZoom = 1;
+
+// Drag/resize DOM writes are coalesced into one animation frame
+let dragFrame = null;
+let pendingMove = null;
+
+function getMinDimensionsForContent(box) {
+    // Find the actual rendered box in the editor to measure its content
+    const boxDiv = document.querySelector(`.editor-box[data-index="${editorBoxes.indexOf(box)}"]`);
+    if (boxDiv) {
+        const content = boxDiv.querySelector('.editor-box-content');
+        if (content) {
+            // Measure the actual scroll dimensions needed
+            const headerHeight = boxDiv.querySelector('.editor-box-header').offsetHeight;
+            const minHeight = headerHeight + content.scrollHeight + 4;
+            const minWidth = Math.max(60, content.scrollWidth + 6);
+            return { width: minWidth, height: minHeight };
+        }
+    }
+    
+    // Fallback: measure with the shared canvas context (no DOM layout)
+    const contentHeight = measureContentHeight(box.content, box.width - 6);
+    
+    // Header height (3mm ≈ 11px in editor)
+    const headerHeight = 11;
+    const minHeight = headerHeight + contentHeight + 4;
+    
+    return { width: 60, height: minHeight };
+}
+
+// Text measurement for boxes that aren't in the DOM yet. One 2D context
+// is shared by every call; measureText never triggers a page reflow.
+const MEASURE_FONT = "4.75pt Helvetica, Arial, sans-serif";
+const MEASURE_LINE_HEIGHT = 4.75 * 96 / 72 * 1.15;  // px, line-height: 1.15
+const MEASURE_PADDING = 2;  // 1px top + 1px bottom
+const measureCtx = (typeof OffscreenCanvas !== 'undefined'
+    ? new OffscreenCanvas(0, 0)
+    : document.createElement('canvas')).getContext('2d');
+if (measureCtx) measureCtx.font = MEASURE_FONT;
+const contentHeightCache = new Map();
+
+function countWrappedLines(line, maxWidth) {
+    if (!line || measureCtx.measureText(line).width <= maxWidth) return 1;
+    
+    const spaceWidth = measureCtx.measureText(' ').width;
+    let lines = 1;
+    let lineWidth = 0;
+    for (const word of line.split(' ')) {
+        const wordWidth = measureCtx.measureText(word).width;
+        if (lineWidth > 0 && lineWidth + spaceWidth + wordWidth > maxWidth) {
+            lines++;
+            lineWidth = wordWidth;
+        } else {
+            lineWidth += (lineWidth > 0 ? spaceWidth : 0) + wordWidth;
+        }
+    }
+    return lines;
+}
+
+function measureContentHeightInDom(content, width) {
+    const measureDiv = document.createElement('div');
+    measureDiv.style.cssText = `
+        position: absolute;
+        visibility: hidden;
+        font-size: 4.75pt;
+        line-height: 1.15;
+        font-family: 'Helvetica', 'Arial', sans-serif;
+        padding: 1px 1.5px;
+        white-space: pre-wrap;
+        width: ${width}px;
+    `;
+    measureDiv.textContent = content;
+    document.body.appendChild(measureDiv);
+    
+    const height = measureDiv.offsetHeight;
+    document.body.removeChild(measureDiv);
+    return height;
+}
+
+function measureContentHeight(content, width) {
+    if (!measureCtx) return measureContentHeightInDom(content, width);
+    
+    const key = width + '|' + content;
+    let height = contentHeightCache.get(key);
+    if (height !== undefined) return height;
+    
+    let lines = 0;
+    for (const line of content.split('\n')) {
+        lines += countWrappedLines(line, width - 3);  // 1.5px side padding
+    }
+    height = lines * MEASURE_LINE_HEIGHT + MEASURE_PADDING;
+    
+    if (contentHeightCache.size > 500) contentHeightCache.clear();
+    contentHeightCache.set(key, height);
+    return height;
+}
+
+async function checkContentOverflow(boxDiv) {
+    const content = boxDiv.querySelector('.editor-box-content');
+    if (!content) return;
+    
+    // First, do a quick client-side check
+    const isOverflowing = content.scrollHeight > content.clientHeight + 2;
+    boxDiv.classList.remove('content-overflow', 'content-fits');
+    boxDiv.classList.add(isOverflowing ? 'content-overflow' : 'content-fits');
+    
+    // Then do server-side validation for more accuracy
+    await checkServerOverflow(boxDiv);
+}
+
+async function checkServerOverflow(boxDiv) {
+    const boxIndex = parseInt(boxDiv.dataset.index);
+    if (boxIndex !== undefined && boxIndex < editorBoxes.length) {
+        const box = editorBoxes[boxIndex];
+        try {
+            const estimatedHeight = await estimateServerHeight(box.content, box.width);
+            if (estimatedHeight > 0) {
+                const willOverflow = estimatedHeight > box.height + 5;
+                boxDiv.classList.remove('content-overflow', 'content-fits');
+                boxDiv.classList.add(willOverflow ? 'content-overflow' : 'content-fits');
+                
+                // Add tooltip showing overflow amount
+                if (willOverflow) {
+                    const diff = Math.round(estimatedHeight - box.height);
+                    boxDiv.setAttribute('title', `⚠️ Content will overflow by ~${diff}px in PDF`);
+                } else {
+                    boxDiv.setAttribute('title', '✓ Content fits in PDF');
+                }
+            }
+        } catch (error) {
+            // Fall back to client-side check on error
+            console.error('Error checking overflow:', error);
+        }
+    }
+}
+
+function checkAllOverflows() {
+    document.querySelectorAll('.editor-box').forEach(checkContentOverflow);
+}
+
+// Client-side overflow classes for boxes changed during a drag/resize. Checks are
+// collected and applied once per animation frame: all layout reads first, then
+// all class writes, so the mousemove handler never forces a synchronous reflow.
+const pendingOverflowDivs = new Set();
+let overflowFrame = null;
+
+function scheduleOverflowCheck(boxDiv) {
+    pendingOverflowDivs.add(boxDiv);
+    if (overflowFrame === null) {
+        overflowFrame = requestAnimationFrame(flushOverflowChecks);
+    }
+}
+
+function flushOverflowChecks() {
+    overflowFrame = null;
+    const divs = [...pendingOverflowDivs];
+    pendingOverflowDivs.clear();
+    
+    const overflowing = divs.map(div => {
+        const content = div.querySelector('.editor-box-content');
+        return content ? content.scrollHeight > content.clientHeight + 2 : null;
+    });
+    divs.forEach((div, i) => {
+        if (overflowing[i] === null) return;
+        div.classList.remove('content-overflow', 'content-fits');
+        div.classList.add(overflowing[i] ? 'content-overflow' : 'content-fits');
+    });
+}
+
+const BOX_RE = /\[BOX:([A-Za-z0-9\-_]+)\]\s*\[TITLE:([^\]]+)\]\s*([\s\S]*?)\[\/BOX\]/g;
+
+function parseBoxes(aiOutput) {
+    const boxes = [];
+    let match;
+    
+    BOX_RE.lastIndex = 0;
+    while ((match = BOX_RE.exec(aiOutput)) !== null) {
+        boxes.push({
+            id: match[1].trim(),
+            title: match[2].trim(),
+            content: match[3].trim(),
+            category: match[1].charAt(0).toUpperCase()
+        });
+    }
+    return boxes;
+}
+
+function estimateBoxHeight(content, width) {
+    // Code fences aren't drawn, so leave them out of the measurement
+    const text = content.split('\n').filter(l => !l.trim().startsWith('```')).join('\n');
+    const headerHeight = 11;
+    return Math.max(60, Math.min(300, headerHeight + measureContentHeight(text, width - 6) + 4));
+}
+
+// Last /calculate-layout response, reused while the AI output is unchanged
+let lastLayoutInput = null;
+let lastLayoutData = null;
+
+async function fetchLayout(aiOutput) {
+    if (aiOutput === lastLayoutInput) return lastLayoutData;
+    
+    const response = await fetch('/calculate-layout', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ ai_output: aiOutput })
+    });
+    const data = await response.json();
+    
+    if (!data.error) {
+        lastLayoutInput = aiOutput;
+        lastLayoutData = data;
+    }
+    return data;
+}
+
+async function openEditor() {
+    const aiOutput = document.getElementById('ai-output').value;
+    const result = document.getElementById('result');
+    
+    if (!aiOutput.trim()) {
+        result.innerHTML = '<div class="error">Please paste AI output first</div>';
+        return;
+    }
+    
+    result.innerHTML = '<div class="info">Calculating layout...</div>';
+    
+    try {
+        // Fetch the EXACT layout from the server (same as PDF generation)
+        const data = await fetchLayout(aiOutput);
+        
+        if (data.error) {
+            result.innerHTML = '<div class="error">' + data.error + '</div>';
+            return;
+        }
+        
+        // Use the server-calculated layout (matches PDF exactly)
+        const layoutById = new Map(data.layout.map(l => [l.id, l]));
+        editorBoxes = data.boxes.map(box => {
+            const layoutInfo = layoutById.get(box.id);
+            // baseHeight keeps the original height for scaling
+            return layoutInfo
+                ? makeEditorBox(box.id, box.title, box.content, box.category,
+                                layoutInfo.x, layoutInfo.y, layoutInfo.width, layoutInfo.height)
+                : makeEditorBox(box.id, box.title, box.content, box.category, 0, 0, 180, 100);
+        });
+        
+        result.innerHTML = '';
+        renderEditor();
+        document.getElementById('editor-container').classList.add('visible');
+        document.body.style.overflow = 'hidden';
+    } catch (e) {
+        result.innerHTML = '<div class="error">Error: ' + e.message + '</div>';
+    }
+}
+
+function closeEditor() {
+    document.getElementById('editor-container').classList.remove('visible');
+    document.body.style.overflow = '';
+}
+
+function autoArrange() {
+    // Server layout to match PDF exactly (reused if the AI output is unchanged)
+    const aiOutput = document.getElementById('ai-output').value;
+    if (!aiOutput.trim()) return;
+    
+    fetchLayout(aiOutput).then(data => {
+        if (data.error) return;
+        
+        const layoutById = new Map(data.layout.map(l => [l.id, l]));
+        editorBoxes.forEach(box => {
+            const layoutInfo = layoutById.get(box.id);
+            if (layoutInfo) {
+                box.x = layoutInfo.x;
+                box.y = layoutInfo.y;
+                box.width = layoutInfo.width;
+                box.height = layoutInfo.height;
+            }
+        });
+        
+        renderEditor();
+    });
+}
+
+function resetLayout() {
+    autoArrange();
+}
+
+function updateCanvasSize() {
+    let maxY = 0;
+    for (const b of editorBoxes) {
+        const y = b.y + b.height;
+        if (y > maxY) maxY = y;
+    }
+    maxY += MARGIN;
+    const numPages = Math.ceil(maxY / PAGE_HEIGHT);
+    const canvas = document.getElementById('editor-canvas');
+    
+    // Only touch the DOM when the page count actually changes
+    if (canvas._numPages === numPages) return;
+    canvas._numPages = numPages;
+    
+    canvas.style.width = PAGE_WIDTH + 'px';
+    canvas.style.height = Math.max(PAGE_HEIGHT, numPages * PAGE_HEIGHT) + 'px';
+    
+    // Update page indicator
+    document.getElementById('page-indicator').textContent = `${numPages} Page${numPages > 1 ? 's' : ''}`;
+    
+    // Add page dividers (tracked on the canvas rather than re-queried)
+    (canvas._dividers || []).forEach(d => d.remove());
+    canvas._dividers = [];
+    for (let p = 1; p < numPages; p++) {
+        const divider = document.createElement('div');
+        divider.className = 'page-divider';
+        divider.style.top = (p * PAGE_HEIGHT) + 'px';
+        canvas.appendChild(divider);
+        canvas._dividers.push(divider);
+    }
+}
+
+function renderEditor() {
+    const canvas = document.getElementById('editor-canvas');
+    
+    // Remove existing boxes
+    canvas.querySelectorAll('.editor-box').forEach(b => b.remove());
+    canvas.querySelectorAll('.snap-guide').forEach(g => g.remove());
+    
+    // Build all boxes off-document and attach them in one go. Each box is a
+    // clone of the <template>; text goes in via textContent, so no HTML parsing
+    const template = document.getElementById('box-tpl').content.firstElementChild;
+    const frag = document.createDocumentFragment();
+    const divs = [];
+    
+    editorBoxes.forEach((box, index) => {
+        const div = template.cloneNode(true);
+        div.dataset.index = index;
+        div.style.left = box.x + 'px';
+        div.style.top = box.y + 'px';
+        div.style.width = box.width + 'px';
+        div.style.height = box.height + 'px';
+        
+        const header = div.firstElementChild;
+        header.classList.add('cat-' + box.category);
+        header.firstElementChild.textContent = box.id + ' ' + box.title;
+        div.querySelector('.editor-box-content').textContent = box.content;
+        
+        frag.appendChild(div);
+        divs.push(div);
+    });
+    
+    canvas.appendChild(frag);
+    updateCanvasSize();
+    
+    // Check overflow for every box: one read-then-write pass in the next frame,
+    // plus one batched server estimate
+    divs.forEach(div => {
+        scheduleOverflowCheck(div);
+        checkServerOverflow(div);
+    });
+}
+
+function startDrag(e, index) {
+    if (e.target.classList.contains('resize-handle')) return;
+    e.preventDefault();
+    
+    selectedBox = index;
+    isDragging = true;
+    
+    const box = editorBoxes[index];
+    const rect = e.target.closest('.editor-box').getBoundingClientRect();
+    const canvasRect = document.getElementById('editor-canvas').getBoundingClientRect();
+    
+    dragOffset.x = e.clientX - rect.left;
+    dragOffset.y = e.clientY - rect.top;
+    
+    document.querySelectorAll('.editor-box').forEach(b => b.classList.remove('selected'));
+    e.target.closest('.editor-box').classList.add('selected', 'dragging');
+}
+
+function startResize(e, index) {
+    e.preventDefault();
+    e.stopPropagation();
+    
+    selectedBox = index;
+    isResizing = true;
+    
+    document.querySelectorAll('.editor-box').forEach(b => b.classList.remove('selected'));
+    e.target.closest('.editor-box').classList.add('selected');
+}
+
+document.addEventListener('mousemove', (e) => {
+    if (selectedBox === null) return;
+    
+    const canvas = document.getElementById('editor-canvas');
+    const canvasRect = canvas.getBoundingClientRect();
+    const box = editorBoxes[selectedBox];
+    const snapEnabled = document.getElementById('snap-to-grid').checked;
+    
+    if (isDragging) {
+        let newX = (e.clientX - canvasRect.left) / currentZoom - dragOffset.x;
+        let newY = (e.clientY - canvasRect.top) / currentZoom - dragOffset.y;
+        
+        if (snapEnabled) {
+            newX = Math.round(newX / GRID_SIZE) * GRID_SIZE;
+            newY = Math.round(newY / GRID_SIZE) * GRID_SIZE;
+        }
+        
+        // Constrain to canvas
+        newX = Math.max(MARGIN, Math.min(PAGE_WIDTH - box.width - MARGIN, newX));
+        newY = Math.max(MARGIN, newY);
+        
+        box.x = newX;
+        box.y = newY;
+        
+        scheduleDragFrame(false);
+    }
+    
+    if (isResizing) {
+        let newWidth = (e.clientX - canvasRect.left) / currentZoom - box.x;
+        let newHeight = (e.clientY - canvasRect.top) / currentZoom - box.y;
+        
+        if (snapEnabled) {
+            newWidth = Math.round(newWidth / GRID_SIZE) * GRID_SIZE;
+            newHeight = Math.round(newHeight / GRID_SIZE) * GRID_SIZE;
+        }
+        
+        // Simple minimum constraints (allow user to resize freely)
+        box.width = Math.max(50, Math.min(PAGE_WIDTH - box.x - MARGIN, newWidth));
+        box.height = Math.max(30, newHeight);
+        
+        scheduleDragFrame(true);
+    }
+});
+
+function scheduleDragFrame(resized) {
+    pendingMove = { index: selectedBox, resized: resized || (pendingMove !== null && pendingMove.resized) };
+    if (dragFrame === null) {
+        dragFrame = requestAnimationFrame(flushDrag);
+    }
+}
+
+function flushDrag() {
+    if (dragFrame !== null) {
+        cancelAnimationFrame(dragFrame);
+        dragFrame = null;
+    }
+    const move = pendingMove;
+    pendingMove = null;
+    if (move === null) return;
+    
+    const box = editorBoxes[move.index];
+    const div = document.getElementById('editor-canvas')
+        .querySelector(`.editor-box[data-index="${move.index}"]`);
+    if (!box || !div) return;
+    
+    div.style.left = box.x + 'px';
+    div.style.top = box.y + 'px';
+    if (move.resized) {
+        div.style.width = box.width + 'px';
+        div.style.height = box.height + 'px';
+        // Quick client-side check each frame; the server check runs on mouseup
+        scheduleOverflowCheck(div);
+    }
+    
+    updateCanvasSize();
+}
+
+document.addEventListener('mouseup', () => {
+    // Apply the last move before the final overflow check reads the box size
+    flushDrag();
+    if (selectedBox !== null) {
+        const div = document.getElementById('editor-canvas')
+            .querySelector(`.editor-box[data-index="${selectedBox}"]`);
+        if (div) {
+            div.classList.remove('dragging');
+            // Resize finished: validate the final size against the PDF renderer
+            if (isResizing) checkContentOverflow(div);
+        }
+    }
+    isDragging = false;
+    isResizing = false;
+});
+
+function toggleGrid() {
+    const grid = document.getElementById('grid-overlay');
+    grid.style.display = document.getElementById('show-grid').checked ? 'block' : 'none';
+}
+
+function setZoom(value) {
+    currentZoom = value / 100;
+    document.getElementById('zoom-value').textContent = value + '%';
+    const canvas = document.getElementById('editor-canvas');
+    canvas.style.transform = `scale(${currentZoom})`;
+    canvas.style.transformOrigin = 'top left';
+}
+
+function exportFromEditor() {
+    // Send the boxes as structured data so the server doesn't re-parse them
+    const boxesData = editorBoxes.map(box => ({
+        id: box.id,
+        title: box.title,
+        content: box.content
+    }));
+    
+    // Build layout data
+    const layoutData = editorBoxes.map(box => ({
+        id: box.id,
+        x: box.x,
+        y: box.y,
+        width: box.width,
+        height: box.height
+    }));
+    
+    // Send to server
+    document.getElementById('result').innerHTML = '<div class="success">Generating PDF with custom layout...</div>';
+    
+    fetch('/generate-with-layout', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ 
+            boxes: boxesData,
+            layout: layoutData
+        })
+    })
+    .then(response => {
+        if (response.ok) return response.blob();
+        return response.json().then(err => { throw new Error(err.error); });
+    })
+    .then(blob => {
+        downloadBlob(blob, 'cheatsheet.pdf');
+        document.getElementById('result').innerHTML = '<div class="success">✓ PDF downloaded!</div>';
+    })
+    .catch(err => {
+        document.getElementById('result').innerHTML = '<div class="error">Error: ' + err.message + '</div>';
+    });
+}
+
+// ========== Edit Modal Functions ==========
+let editingBoxIndex = null;
+
+function addNewBox() {
+    // Generate a new ID based on existing boxes
+    const existingIds = new Set(editorBoxes.map(b => b.id));
+    let newId = 'X1';
+    let counter = 1;
+    while (existingIds.has(newId)) {
+        counter++;
+        newId = 'X' + counter;
+    }
+    
+    const newBox = makeEditorBox(
+        newId,
+        'New Box',
+        '• Add your content here\n• Use bullet points\n• Use **bold** for emphasis',
+        'A',
+        MARGIN, MARGIN, 180, 80
+    );
+    
+    editorBoxes.push(newBox);
+    renderEditor();
+    
+    // Open edit modal for the new box
+    openEditModal(editorBoxes.length - 1);
+}
+
+function openEditModal(index, event) {
+    if (event) {
+        event.preventDefault();
+        event.stopPropagation();
+    }
+    
+    editingBoxIndex = index;
+    const box = editorBoxes[index];
+    
+    document.getElementById('edit-box-id').textContent = box.id;
+    document.getElementById('edit-box-id-input').value = box.id;
+    document.getElementById('edit-box-title').value = box.title;
+    document.getElementById('edit-box-content').value = box.content;
+    
+    document.getElementById('edit-modal-overlay').classList.add('visible');
+    document.getElementById('edit-box-title').focus();
+    
+    // Update height info when opening
+    updateHeightInfo();
+    
+    // Add event listener for content changes
+    const contentTextarea = document.getElementById('edit-box-content');
+    contentTextarea.removeEventListener('input', scheduleHeightInfoUpdate);
+    contentTextarea.addEventListener('input', scheduleHeightInfoUpdate);
+}
+
+function closeEditModal() {
+    clearTimeout(heightInfoTimer);
+    if (heightAbort) heightAbort.abort();
+    editingBoxIndex = null;
+    document.getElementById('edit-modal-overlay').classList.remove('visible');
+}
+
+function saveBoxEdit() {
+    if (editingBoxIndex === null) return;
+    
+    const box = editorBoxes[editingBoxIndex];
+    const newId = document.getElementById('edit-box-id-input').value.trim() || box.id;
+    
+    box.id = newId;
+    box.category = newId.charAt(0).toUpperCase();
+    box.title = document.getElementById('edit-box-title').value;
+    box.content = document.getElementById('edit-box-content').value;
+    
+    // Recalculate height based on new content
+    box.height = estimateBoxHeight(box.content, box.width);
+    
+    closeEditModal();
+    renderEditor();
+}
+
+// Height estimates requested within the same few milliseconds (e.g. one per box
+// after renderEditor) are coalesced into a single /estimate-heights request
+const HEIGHT_BATCH_DELAY = 16;  // ms
+let pendingHeightRequests = [];
+let heightBatchTimer = null;
+
+function estimateServerHeight(content, width, signal) {
+    // Cancellable requests (edit modal) go out on their own, not in a shared batch
+    if (signal) {
+        return estimateServerHeights([{ content, width }], signal).then(heights => heights[0] || 0);
+    }
+    return new Promise(resolve => {
+        pendingHeightRequests.push({ content, width, resolve });
+        if (heightBatchTimer === null) {
+            heightBatchTimer = setTimeout(flushHeightRequests, HEIGHT_BATCH_DELAY);
+        }
+    });
+}
+
+async function flushHeightRequests() {
+    const batch = pendingHeightRequests;
+    pendingHeightRequests = [];
+    heightBatchTimer = null;
+    
+    const heights = await estimateServerHeights(batch.map(r => ({ content: r.content, width: r.width })));
+    batch.forEach((r, i) => r.resolve(heights[i] || 0));
+}
+
+async function estimateServerHeights(items, signal) {
+    try {
+        const response = await fetch('/estimate-heights', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ items }),
+            priority: 'low',  // background check; don't compete with layout/export
+            signal
+        });
+        const data = await response.json();
+        return data.estimated_heights || [];
+    } catch (error) {
+        if (error.name === 'AbortError') throw error;
+        console.error('Error estimating heights:', error);
+        return [];
+    }
+}
+
+// Trailing debounce for the edit modal: only estimate once typing pauses
+const HEIGHT_INFO_DELAY = 150;  // ms
+let heightInfoTimer = null;
+let heightAbort = null;
+
+function scheduleHeightInfoUpdate() {
+    clearTimeout(heightInfoTimer);
+    heightInfoTimer = setTimeout(updateHeightInfo, HEIGHT_INFO_DELAY);
+}
+
+async function updateHeightInfo() {
+    if (editingBoxIndex === null) return;
+    
+    const box = editorBoxes[editingBoxIndex];
+    const content = document.getElementById('edit-box-content').value;
+    
+    // Cancel the previous estimate so a stale answer can't overwrite this one
+    if (heightAbort) heightAbort.abort();
+    const controller = heightAbort = new AbortController();
+    
+    // Get estimated height from server
+    let estimatedHeight;
+    try {
+        estimatedHeight = await estimateServerHeight(content, box.width, controller.signal);
+    } catch (error) {
+        if (error.name === 'AbortError') return;
+        throw error;
+    }
+    if (heightAbort === controller) heightAbort = null;
+    
+    const heightInfo = document.getElementById('height-info');
+    const statusText = document.getElementById('height-status-text');
+    
+    if (estimatedHeight > 0) {
+        heightInfo.style.display = 'block';
+        
+        const currentHeight = box.height;
+        const diff = Math.round(estimatedHeight - currentHeight);
+        
+        if (diff > 5) {
+            statusText.innerHTML = `<span style="color: #e74c3c;">⚠️ Content will overflow by ~${diff}px</span>`;
+        } else if (diff < -20) {
+            statusText.innerHTML = `<span style="color: #3498db;">ℹ️ Box has ${-diff}px extra space</span>`;
+        } else {
+            statusText.innerHTML = `<span style="color: #27ae60;">✓ Content fits well</span>`;
+        }
+    } else {
+        heightInfo.style.display = 'none';
+    }
+}
+
+async function autoFitHeight() {
+    if (editingBoxIndex === null) return;
+    
+    const box = editorBoxes[editingBoxIndex];
+    const content = document.getElementById('edit-box-content').value;
+    
+    // Get estimated height from server
+    const estimatedHeight = await estimateServerHeight(content, box.width);
+    
+    if (estimatedHeight > 0) {
+        box.height = Math.max(30, Math.round(estimatedHeight));
+        await updateHeightInfo();
+    }
+}
+
+function deleteBox() {
+    if (editingBoxIndex === null) return;
+    
+    if (confirm('Are you sure you want to delete this box?')) {
+        editorBoxes.splice(editingBoxIndex, 1);
+        closeEditModal();
+        renderEditor();
+    }
+}
+
+// Close modal on Escape key
+document.addEventListener('keydown', (e) => {
+    if (e.key === 'Escape' && document.getElementById('edit-modal-overlay').classList.contains('visible')) {
+        closeEditModal();
+        e.stopPropagation();
+        return;
+    }
+});
+
+// Keyboard shortcuts
+document.addEventListener('keydown', (e) => {
+    // Skip if modal is open
+    if (document.getElementById('edit-modal-overlay').classList.contains('visible')) return;
+    if (!document.getElementById('editor-container').classList.contains('visible')) return;
+    
+    if (e.key === 'Escape') {
+        closeEditor();
+    }
+    
+    if (selectedBox !== null) {
+        const box = editorBoxes[selectedBox];
+        const step = e.shiftKey ? 10 : 1;
+        
+        if (e.key === 'ArrowLeft') { box.x -= step; e.preventDefault(); }
+        if (e.key === 'ArrowRight') { box.x += step; e.preventDefault(); }
+        if (e.key === 'ArrowUp') { box.y -= step; e.preventDefault(); }
+        if (e.key === 'ArrowDown') { box.y += step; e.preventDefault(); }
+        
+        // Open edit on Enter key
+        if (e.key === 'Enter') {
+            openEditModal(selectedBox, e);
+        }
+        
+        renderEditor();
+    }
+});
+
+// Box drag/resize/edit handlers are delegated to the canvas, so renderEditor()
+// doesn't attach a fresh set of listeners to every box
+const editorCanvas = document.getElementById('editor-canvas');
+if (editorCanvas) {
+    const boxIndex = (e) => {
+        const boxDiv = e.target.closest('.editor-box');
+        return boxDiv ? Number(boxDiv.dataset.index) : null;
+    };
+    
+    editorCanvas.addEventListener('mousedown', function(e) {
+        const index = boxIndex(e);
+        if (index === null) return;
+        if (e.target.classList.contains('resize-handle')) {
+            startResize(e, index);
+        } else {
+            startDrag(e, index);
+        }
+    });
+    
+    editorCanvas.addEventListener('click', function(e) {
+        if (!e.target.closest('.editor-box-edit-btn')) return;
+        const index = boxIndex(e);
+        if (index !== null) openEditModal(index, e);
+    });
+    
+    // Double-click to edit
+    editorCanvas.addEventListener('dblclick', function(e) {
+        const index = boxIndex(e);
+        if (index !== null) openEditModal(index, e);
+    });
+}
+
+// Close modal on overlay click
+const editModalOverlay = document.getElementById('edit-modal-overlay');
+if (editModalOverlay) {
+    editModalOverlay.addEventListener('click', function(e) {
+        if (e.target.id === 'edit-modal-overlay') {
+            closeEditModal();
+        }
+    });
+}
@@ -0,0 +1,72 @@
+"""Request validation of the editor endpoints."""
+
+import pytest
+
+import app as app_module
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+@pytest.mark.parametrize("payload", [
+    {"items": [1]},
+    {"items": "not a list"},
+    [1],
+    {"items": [{"content": 5, "width": 100}]},
+    {"items": [{"content": "x", "width": "100"}]},
+    {"items": [{"content": "x", "width": True}]},
+    {"items": [{"content": "x", "width": 0}]},
+    {"items": [{"content": "x", "width": -10}]},
+    {"items": [{"content": "x", "width": 100}] * (app_module.MAX_BATCH_ITEMS + 1)},
+])
+def test_estimate_heights_rejects_bad_items(client, payload):
+    r = client.post('/estimate-heights', json=payload)
+    assert r.status_code == 400
+    assert r.get_json() == {'error': 'Invalid items payload'}
+
+
+def test_estimate_heights_measures_each_item(client):
+    r = client.post('/estimate-heights', json={'items': [
+        {'content': 'short', 'width': 200},
+        {'content': '- one\n- two\n- three', 'width': 200},
+        {'content': ''},
+    ]})
+    assert r.status_code == 200
+    heights = r.get_json()['estimated_heights']
+    assert len(heights) == 3
+    assert heights[1] > heights[0] > 0
+    assert heights[2] == 0
+
+
+def _layout(box_id):
+    return [{'id': box_id, 'x': 10, 'y': 10, 'width': 200, 'height': 60}]
+
+
+@pytest.mark.parametrize("boxes", [
+    "not a list",
+    [1],
+    [{'id': 'A1', 'title': 5, 'content': 'x'}],
+    [{'title': 't', 'content': 'x'}],
+    [{'id': 'foo bar', 'title': 't', 'content': 'x'}],
+    [{'id': '[x]', 'title': 't', 'content': 'x'}],
+    [{'id': 'a1', 'title': 't', 'content': 'x'}],
+])
+def test_generate_with_layout_rejects_bad_boxes(client, boxes):
+    r = client.post('/generate-with-layout', json={'boxes': boxes, 'layout': _layout('A1')})
+    assert r.status_code == 400
+    assert r.get_json() == {'error': 'Invalid boxes payload'}
+
+
+def test_generate_with_layout_requires_input(client):
+    r = client.post('/generate-with-layout', json={'layout': _layout('A1')})
+    assert r.status_code == 400
+
+
+def test_generate_with_layout_renders_structured_boxes(client):
+    boxes = [{'id': ' B12 ', 'title': 'Title', 'content': '- one\n- **two**'}]
+    r = client.post('/generate-with-layout', json={'boxes': boxes, 'layout': _layout('B12')})
+    assert r.status_code == 200
+    assert r.mimetype == 'application/pdf'
+    assert r.get_data().startswith(b'%PDF')
@@ -0,0 +1,74 @@
+"""Packing and header fitting in the renderer."""
+
+import io
+import random
+
+import pytest
+
+import renderer
+from main import _sample_ai_output
+from parser import Box, parse_ai_output
+
+
+def _overlaps(a, b, gap):
+    """Whether two (x, y_top, w, h) rectangles overlap, counting the column gap."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return not (ax + aw + gap <= bx or ax >= bx + bw + gap or
+                ay - ah >= by or ay <= by - bh)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_skyline_placements_never_overlap(seed):
+    rng = random.Random(seed)
+    left, right, top, bottom, gap = 10.0, 800.0, 580.0, 10.0, 5.0
+    skyline = renderer._new_skyline(left, right, top, gap)
+    placed = []
+
+    for _ in range(60):
+        w, h = rng.uniform(70, 400), rng.uniform(10, 200)
+        x, y = renderer._find_best_position(skyline, w, h, right, bottom, gap)
+        if x is None:
+            break
+
+        assert left <= x and x + w <= right + 1e-9
+        assert y <= top and y - h >= bottom - 1e-9
+        for rect in placed:
+            assert not _overlaps((x, y, w, h), rect, gap - 1e-9)
+
+        renderer._add_to_skyline(skyline, x, w, h, y, gap)
+        placed.append((x, y, w, h))
+
+
+def test_packed_pages_stay_on_the_page_without_overlap():
+    boxes = parse_ai_output(_sample_ai_output()) * 4
+    boxes = [Box(f"{b.id[0]}{i}", b.title, b.content) for i, b in enumerate(boxes)]
+    r = renderer.CheatSheetRenderer(io.BytesIO())
+
+    pages = list(r._pack_pages(boxes))
+    assert sum(len(page) for page in pages) == len(boxes)
+
+    for page_num, page in enumerate(pages):
+        for i, p in enumerate(page):
+            assert p.page == page_num
+            assert p.x >= r.margin and p.x + p.width <= r.page_width - r.margin + 1e-9
+            assert p.y - p.height >= r.margin - 1e-9
+            for q in page[:i]:
+                assert not _overlaps((p.x, p.y, p.width, p.height),
+                                     (q.x, q.y, q.width, q.height), r.column_gap - 1e-9)
+
+
+def test_fit_header_matches_chopping_one_character_at_a_time():
+    r = renderer.CheatSheetRenderer(io.BytesIO())
+    font, size = renderer.FONT_BOLD, r.header_font_size
+
+    def chop(header, max_width):
+        while r._sw(header, font, size) > max_width and len(header) > 20:
+            header = header[:-4] + "..."
+        return header
+
+    rng = random.Random(0)
+    for _ in range(500):
+        header = "".join(rng.choice("abcW iMl.") for _ in range(rng.randint(1, 120)))
+        max_width = rng.uniform(0, 200)
+        assert r._fit_header(header, max_width) == chop(header, max_width)
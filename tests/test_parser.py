@@ -0,0 +1,33 @@
+"""Streaming parser against the whole-text parser."""
+
+import random
+
+import pytest
+
+from main import _sample_ai_output
+from parser import parse_ai_output, parse_ai_output_stream
+
+
+def _split(text, rng, pieces):
+    cuts = sorted(rng.sample(range(1, len(text)), pieces))
+    return [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_stream_matches_full_parse_at_any_split(seed):
+    text = _sample_ai_output()
+    rng = random.Random(seed)
+    chunks = _split(text, rng, rng.randint(1, 200))
+
+    assert list(parse_ai_output_stream(chunks)) == parse_ai_output(text)
+
+
+def test_stream_split_inside_delimiters():
+    text = _sample_ai_output()
+    # One character at a time cuts through every [BOX:..] and [/BOX]
+    assert list(parse_ai_output_stream(iter(text))) == parse_ai_output(text)
+
+
+def test_stream_ignores_unterminated_box():
+    text = _sample_ai_output() + "\n[BOX:Z9]\n[TITLE:Cut off]\nno closing tag"
+    assert list(parse_ai_output_stream([text])) == parse_ai_output(text)